@@ -0,0 +1,303 @@
+"""
+Post-processing for solutions to the sliding puzzle.
+
+A solution is a list of moves named the same way the arrow keys are handled by
+PuzzleBoard: "up" slides the piece below the empty space up, "down" slides the
+piece above it down, and so on. A board state is a flat, row-major tuple of piece
+numbers, where a piece's number is its solved position (row * size + column).
+The empty space is the piece that belongs in the bottom-right corner, same as
+PuzzleBoard.empty_piece_position starts out.
+"""
+
+MOVES = ("up", "down", "left", "right")
+INVERSES = {"up": "down", "down": "up", "left": "right", "right": "left"}
+# How each move shifts the empty space, as (dx, dy)
+BLANK_OFFSETS = {"up": (0, 1), "down": (0, -1), "left": (1, 0), "right": (-1, 0)}
+
+# Format tags for encoded move sequences
+PACKED = 0
+RUN_LENGTH = 1
+MAX_RUN = 64
+
+
+def solved_state(size):
+    """
+    Build the solved board state for a size x size puzzle
+    :param size: The width (and height) of the board
+    :return: A tuple of piece numbers in order
+    """
+    return tuple(range(size * size))
+
+
+def apply_move(state, size, move):
+    """
+    Apply a single move to a board state
+    :param state: The board state to move from
+    :param size: The width (and height) of the board
+    :param move: One of MOVES
+    :return: The new board state, or None if the move would slide off the board
+    """
+    blank = state.index(size * size - 1)
+    dx, dy = BLANK_OFFSETS[move]
+    x, y = blank % size + dx, blank // size + dy
+    if not (0 <= x < size and 0 <= y < size):
+        return None
+    other = y * size + x
+    pieces = list(state)
+    pieces[blank], pieces[other] = pieces[other], pieces[blank]
+    return tuple(pieces)
+
+
+def walk(state, size, moves):
+    """
+    Play a list of moves from a board state and record every state passed through
+    :param state: The board state to start from
+    :param size: The width (and height) of the board
+    :param moves: The moves to play
+    :return: A list of len(moves) + 1 states, starting with the given one
+    """
+    states = [tuple(state)]
+    for i, move in enumerate(moves):
+        next_state = apply_move(states[-1], size, move)
+        if next_state is None:
+            raise ValueError("Move {index} ({move}) is not possible on this board".format(index=i, move=move))
+        states.append(next_state)
+    return states
+
+
+def cancel_inverses(moves):
+    """
+    Remove moves that are immediately undone, like "up" followed by "down".
+    Works like matching brackets, so "left up down right" cancels out entirely.
+    :param moves: The moves to simplify
+    :return: A new list of moves
+    """
+    kept = []
+    for move in moves:
+        if kept and kept[-1] == INVERSES[move]:
+            kept.pop()
+        else:
+            kept.append(move)
+    return kept
+
+
+def remove_cycles(state, size, moves):
+    """
+    Cut out every stretch of moves that leads back to a board state we've already been in
+    :param state: The board state the moves start from
+    :param size: The width (and height) of the board
+    :param moves: The moves to simplify
+    :return: A new list of moves
+    """
+    current = tuple(state)
+    # Maps each state on the kept path to how many kept moves it took to get there
+    seen = {current: 0}
+    kept = []
+    # path[k] is the state after k kept moves
+    path = [current]
+    for i, move in enumerate(moves):
+        current = apply_move(current, size, move)
+        if current is None:
+            raise ValueError("Move {index} ({move}) is not possible on this board".format(index=i, move=move))
+        if current in seen:
+            # Been here before. Throw away the loop and forget the states in it
+            k = seen[current]
+            for dropped in path[k + 1:]:
+                del seen[dropped]
+            del path[k + 1:]
+            del kept[k:]
+        else:
+            kept.append(move)
+            path.append(current)
+            seen[current] = len(kept)
+    return kept
+
+
+def shortest_path(start, goal, size, max_depth):
+    """
+    Bidirectional breadth-first search between two board states
+    :param start: The board state to start from
+    :param goal: The board state to reach
+    :param size: The width (and height) of the board
+    :param max_depth: Give up on paths longer than this
+    :return: A list of moves, or None if there's no path within max_depth
+    """
+    if start == goal:
+        return []
+    # Each side remembers how it reached a state as (previous state, move)
+    forward = {start: None}
+    backward = {goal: None}
+    forward_frontier = [start]
+    backward_frontier = [goal]
+    depth = 0
+    while depth < max_depth and forward_frontier and backward_frontier:
+        depth += 1
+        # Always grow the smaller side
+        grow_forward = len(forward_frontier) <= len(backward_frontier)
+        frontier, parents, others = ((forward_frontier, forward, backward) if grow_forward
+                                     else (backward_frontier, backward, forward))
+        next_frontier = []
+        meeting = None
+        for current in frontier:
+            for move in MOVES:
+                next_state = apply_move(current, size, move)
+                if next_state is None or next_state in parents:
+                    continue
+                parents[next_state] = (current, move)
+                if next_state in others:
+                    meeting = next_state
+                    break
+                next_frontier.append(next_state)
+            if meeting is not None:
+                break
+        if meeting is not None:
+            return _join(forward, backward, meeting)
+        if grow_forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+    return None
+
+
+def _join(forward, backward, meeting):
+    """
+    Stitch together the two halves of a bidirectional search
+    :param forward: Parent links from the start side
+    :param backward: Parent links from the goal side
+    :param meeting: The state both sides reached
+    :return: A list of moves from start to goal
+    """
+    head = []
+    current = meeting
+    while forward[current] is not None:
+        current, move = forward[current]
+        head.append(move)
+    head.reverse()
+    # The goal side searched backwards, so its moves have to be undone on the way out
+    tail = []
+    current = meeting
+    while backward[current] is not None:
+        current, move = backward[current]
+        tail.append(INVERSES[move])
+    return head + tail
+
+
+def reoptimize_windows(state, size, moves, window=10):
+    """
+    Slide a window along the moves and replace each stretch with the shortest
+    sequence that gets between the same two board states
+    :param state: The board state the moves start from
+    :param size: The width (and height) of the board
+    :param moves: The moves to simplify
+    :param window: How many moves to re-solve at a time
+    :return: A new list of moves
+    """
+    moves = list(moves)
+    states = walk(state, size, moves)
+    i = 0
+    while i < len(moves):
+        j = min(i + window, len(moves))
+        better = shortest_path(states[i], states[j], size, j - i - 1)
+        if better is None:
+            i += 1
+            continue
+        # Found something shorter. Splice it in and look at the same spot again,
+        # since the moves after it might shorten further now
+        moves[i:j] = better
+        states[i:j + 1] = walk(states[i], size, better)
+    return moves
+
+
+def shorten(state, size, moves, window=10):
+    """
+    Run every simplification over a solution
+    :param state: The board state the moves start from
+    :param size: The width (and height) of the board
+    :param moves: The moves to simplify
+    :param window: How many moves to re-solve at a time. 0 skips re-solving
+    :return: A new list of moves that ends in the same state
+    """
+    # Make sure every move is possible before anything gets cancelled out
+    walk(state, size, moves)
+    moves = remove_cycles(state, size, cancel_inverses(moves))
+    if window > 1:
+        moves = reoptimize_windows(state, size, moves, window)
+    return moves
+
+
+def _write_count(out, count):
+    """
+    Write a non-negative integer 7 bits at a time, lowest bits first
+    :param out: The bytearray to write to
+    :param count: The integer to write
+    """
+    while count >= 0x80:
+        out.append((count & 0x7f) | 0x80)
+        count >>= 7
+    out.append(count)
+
+
+def _read_count(data, offset):
+    """
+    Read an integer written by _write_count
+    :param data: The bytearray to read from
+    :param offset: Where the integer starts
+    :return: The integer and the offset just past it
+    """
+    count, shift = 0, 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        count |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return count, offset
+        shift += 7
+
+
+def encode_moves(moves):
+    """
+    Encode a list of moves into as few bytes as possible. Each move is packed into
+    2 bits, unless storing (move, run length) pairs in a byte each comes out smaller
+    :param moves: The moves to encode
+    :return: The encoded bytes
+    """
+    codes = [MOVES.index(move) for move in moves]
+
+    packed = bytearray([PACKED])
+    _write_count(packed, len(codes))
+    for i in range(0, len(codes), 4):
+        byte = 0
+        for j, code in enumerate(codes[i:i + 4]):
+            byte |= code << (2 * j)
+        packed.append(byte)
+
+    run_length = bytearray([RUN_LENGTH])
+    i = 0
+    while i < len(codes):
+        run = 1
+        while i + run < len(codes) and codes[i + run] == codes[i] and run < MAX_RUN:
+            run += 1
+        run_length.append(codes[i] | (run - 1) << 2)
+        i += run
+
+    return bytes(min(packed, run_length, key=len))
+
+
+def decode_moves(data):
+    """
+    Decode bytes written by encode_moves
+    :param data: The encoded bytes
+    :return: A list of moves
+    """
+    data = bytearray(data)
+    if not data:
+        raise ValueError("No encoded moves to decode")
+    if data[0] == PACKED:
+        count, offset = _read_count(data, 1)
+        return [MOVES[(data[offset + i // 4] >> (2 * (i % 4))) & 3] for i in range(count)]
+    if data[0] == RUN_LENGTH:
+        moves = []
+        for byte in data[1:]:
+            moves.extend([MOVES[byte & 3]] * ((byte >> 2) + 1))
+        return moves
+    raise ValueError("Unknown move encoding {tag}".format(tag=data[0]))
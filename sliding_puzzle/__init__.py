@@ -2,6 +2,7 @@ from copy import deepcopy
 
 from PySide import QtGui, QtCore
 from utils import *
+from solution_cache import SolutionCache
 import os
 
 
@@ -16,6 +17,7 @@ class GUI(QtGui.QMainWindow):
         PuzzleBoard.BoardHeight = grid_size
         PuzzleBoard.BoardWidth = grid_size
         self.board = PuzzleBoard(self.grid_size)
+        self.cache = SolutionCache(cache_path)
         self.setup_window()
         self.show()
 
@@ -106,7 +108,20 @@ class GUI(QtGui.QMainWindow):
         self.reset()
 
     def solve(self):
-        pass
+        """
+        Solve the puzzle, reusing an earlier solution for the same board if there is one
+        :return:
+        """
+        cached = self.cache.get(self.board.state(), self.grid_size)
+        if cached is not None:
+            self.statusBar().showMessage("Found a {count} move solution in the cache".format(count=len(cached.moves)))
+            self.board.play_moves(cached.moves)
+            return
+        self.statusBar().showMessage("No cached solution for this board")
+
+    def closeEvent(self, event):
+        self.cache.close()
+        super(GUI, self).closeEvent(event)
 
     def reset(self):
         """
@@ -178,6 +193,24 @@ class PuzzleBoard(QtGui.QFrame):
         else:
             QtGui.QWidget.keyPressEvent(self, event)
 
+    def state(self):
+        """
+        Describe the board as a flat, row-major tuple of piece numbers, where a piece's
+        number is where it belongs (row * size + column)
+        :return: The board state
+        """
+        return tuple(int(piece.original_y // self.PieceSize) * self.difficulty +
+                     int(piece.original_x // self.PieceSize) for row in self.pieces for piece in row)
+
+    def play_moves(self, moves):
+        """
+        Play a list of moves named after the arrow keys ("up", "down", "left", "right")
+        :param moves:
+        :return:
+        """
+        for move in moves:
+            getattr(self, "try_move_" + move)(*self.empty_piece_position)
+
     def set_pieces(self, piece_list):
         if self.difficulty == DIFFICULTY_EASY:
             folder = "easy"
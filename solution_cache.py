@@ -0,0 +1,153 @@
+"""
+An on-disk cache of solved boards, so the same puzzle never has to be searched twice.
+
+Boards are stored in a canonical form. Flipping a board over its main diagonal
+(and renumbering the pieces to match) gives a puzzle that's solved by the same
+moves with up/left and down/right swapped, so a board and its transpose share one
+entry. Other reflections would move the empty space's home corner, which means
+the flipped board isn't solved by the flipped moves, so they're not used.
+"""
+import sqlite3
+import time
+from collections import namedtuple
+
+from postprocess import encode_moves, decode_moves
+
+TRANSPOSED_MOVES = {"up": "left", "left": "up", "down": "right", "right": "down"}
+
+CachedSolution = namedtuple("CachedSolution", ["moves", "solver", "seconds"])
+
+
+def transpose(state, size):
+    """
+    Flip a board state over its main diagonal, renumbering the pieces to match
+    :param state: The board state to flip
+    :param size: The width (and height) of the board
+    :return: The flipped board state
+    """
+    def flip(position):
+        return (position % size) * size + position // size
+    return tuple(flip(state[flip(position)]) for position in range(size * size))
+
+
+def canonical(state, size):
+    """
+    Find the canonical key for a board state
+    :param state: The board state
+    :param size: The width (and height) of the board
+    :return: The packed key and whether the board had to be transposed to get it
+    """
+    plain = bytes(bytearray(state))
+    flipped = bytes(bytearray(transpose(state, size)))
+    if flipped < plain:
+        return flipped, True
+    return plain, False
+
+
+class SolutionCache:
+    """
+    Maps canonical board states to their solutions in a SQLite database. Holds at most
+    max_entries solutions, throwing out whichever was used longest ago to make room.
+    """
+
+    def __init__(self, path, max_entries=10000):
+        self.max_entries = max_entries
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS solutions ("
+                                "state BLOB PRIMARY KEY, "
+                                "size INTEGER NOT NULL, "
+                                "moves BLOB NOT NULL, "
+                                "solver TEXT, "
+                                "seconds REAL, "
+                                "last_used INTEGER NOT NULL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used)")
+        self.connection.commit()
+        # A counter rather than a timestamp, so two uses in the same instant still have an order
+        self.clock = self.connection.execute("SELECT COALESCE(MAX(last_used), 0) FROM solutions").fetchone()[0]
+        # Recent uses waiting to be written out, as {(state, size): last_used}. Writing them
+        # on every hit would cost a disk sync per lookup
+        self.recently_used = {}
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def tick(self):
+        self.clock += 1
+        return self.clock
+
+    def get(self, state, size):
+        """
+        Look up the solution for a board
+        :param state: The board state to solve
+        :param size: The width (and height) of the board
+        :return: A CachedSolution, or None if the board hasn't been solved before
+        """
+        key, flipped = canonical(state, size)
+        row = self.connection.execute("SELECT moves, solver, seconds FROM solutions WHERE state = ? AND size = ?",
+                                      (sqlite3.Binary(key), size)).fetchone()
+        if row is None:
+            return None
+        self.recently_used[(key, size)] = self.tick()
+        moves = decode_moves(row[0])
+        if flipped:
+            moves = [TRANSPOSED_MOVES[move] for move in moves]
+        return CachedSolution(moves, row[1], row[2])
+
+    def put(self, state, size, moves, solver=None, seconds=None):
+        """
+        Store the solution for a board, replacing any older one
+        :param state: The board state that was solved
+        :param size: The width (and height) of the board
+        :param moves: The moves that solve it
+        :param solver: The name of whatever found the moves
+        :param seconds: How long it took to find them
+        """
+        key, flipped = canonical(state, size)
+        if flipped:
+            moves = [TRANSPOSED_MOVES[move] for move in moves]
+        self.recently_used.pop((key, size), None)
+        self.write_recently_used()
+        self.connection.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?)",
+                                (sqlite3.Binary(key), size, sqlite3.Binary(encode_moves(moves)),
+                                 solver, seconds, self.tick()))
+        # Throw out whatever hasn't been used in the longest time
+        self.connection.execute("DELETE FROM solutions WHERE state IN "
+                                "(SELECT state FROM solutions ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                                (self.max_entries,))
+        self.connection.commit()
+
+    def write_recently_used(self):
+        """
+        Write out the recent uses that get() has been holding on to. Doesn't commit,
+        so they go out in the same transaction as whatever comes next
+        """
+        self.connection.executemany("UPDATE solutions SET last_used = ? WHERE state = ? AND size = ?",
+                                    [(last_used, sqlite3.Binary(key), size)
+                                     for (key, size), last_used in self.recently_used.items()])
+        self.recently_used.clear()
+
+    def close(self):
+        self.write_recently_used()
+        self.connection.commit()
+        self.connection.close()
+
+
+def cached_solve(cache, state, size, solver, name=None):
+    """
+    Solve a board, checking the cache before searching and saving whatever the search finds.
+    Batch runs should go through here so repeated (or transposed) boards are only searched once.
+    :param cache: The SolutionCache to use
+    :param state: The board state to solve
+    :param size: The width (and height) of the board
+    :param solver: A function taking (state, size) and returning a list of moves, or None if it gave up
+    :param name: The solver's name to store alongside its solutions
+    :return: A list of moves, or None if there's no solution
+    """
+    cached = cache.get(state, size)
+    if cached is not None:
+        return cached.moves
+    started = time.time()
+    moves = solver(state, size)
+    if moves is not None:
+        cache.put(state, size, moves, name or getattr(solver, "__name__", None), time.time() - started)
+    return moves
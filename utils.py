@@ -4,6 +4,7 @@ import heapq
 
 project_root = os.path.dirname(os.path.realpath(__file__))
 resource_root = os.path.join(project_root, "resources")
+cache_path = os.path.join(project_root, "solutions.db")
 DIFFICULTY_EASY = 3
 DIFFICULTY_MEDIUM = 5
 DIFFICULTY_HARD = 8